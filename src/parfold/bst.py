@@ -3,20 +3,52 @@ Binary Search Tree with async comparison and parallel inserts.
 
 Uses optimistic concurrency control for lock-free parallel operations,
 designed for expensive comparison functions like LLM calls.
+
+Design note: the tree is node-oriented (one value per node, threaded
+into a doubly linked list) rather than leaf-oriented with packed leaf
+arrays. Packing multiple values per leaf would cut height, but the
+comparator here is the expensive resource, not memory traffic: placing
+a value within a packed leaf costs O(log leaf_size) extra compares,
+while the threaded list gives O(1) sorted iteration and O(1) head
+eviction that leaf arrays would forfeit. The wins leaf packing targets
+are covered separately: AA rebalancing bounds height, per-node counts
+pack duplicates for free, and insert_many batches all compares against
+a pivot into one gather.
 """
 
 from __future__ import annotations
 from typing import TypeVar, Generic, Callable, Awaitable, Iterator
 from dataclasses import dataclass
+from collections import OrderedDict
 import asyncio
 
+from .primitives import _await_tasks
+
 T = TypeVar("T")
 
 CompareFunc = Callable[[T, T], Awaitable[int]]
 EvictFunc = Callable[[T], Awaitable[None]]
 
+CacheKey = tuple[type, object]
+
+
+def _cache_key(x: object) -> CacheKey:
+    """
+    Cache key for one comparison operand.
+
+    Keys on the value itself when hashable, so equal-but-not-identical
+    values (e.g. two equal strings from different sources) share cache
+    entries. The type is included so 1 and True don't collide. Unhashable
+    values fall back to identity.
+    """
+    try:
+        hash(x)
+    except TypeError:
+        return (type(x), id(x))
+    return (type(x), x)
+
 
-@dataclass
+@dataclass(slots=True)
 class Node(Generic[T]):
     """BST node with linked list threading for O(1) sorted traversal."""
     value: T
@@ -24,7 +56,8 @@ class Node(Generic[T]):
     right: Node[T] | None = None
     prev: Node[T] | None = None  # in-order predecessor
     next: Node[T] | None = None  # in-order successor
-    version: int = 0
+    level: int = 1  # AA-tree level for rebalancing
+    count: int = 1  # Number of equal values collapsed into this node
 
 
 class BST(Generic[T]):
@@ -47,14 +80,35 @@ class BST(Generic[T]):
             print(item)
     """
 
+    # In "splay" mode, splay the first node of a linear run to the root
+    # once this many consecutive straight-spine inserts have occurred.
+    _SPLAY_INTERVAL = 500
+
     def __init__(
         self,
         compare: CompareFunc[T],
         max_retries: int = 100,
         max_size: int | None = None,
         on_evict: EvictFunc[T] | None = None,
+        balance: str | None = "aa",
+        enable_cache: bool = True,
+        cache_size: int = 10_000,
     ):
+        if balance not in ("aa", "splay", None):
+            raise ValueError(f"Unknown balance mode: {balance!r}")
         self._compare = compare
+        self._balance = balance
+        # Comparator results are memoized inline by default: the expected
+        # workload (LLM compares) is pure and expensive, and an inline
+        # dict avoids the extra wrapper coroutine CachedCompare costs.
+        # Bounded LRU (cache_size entries, like CachedCompare.max_size)
+        # so a long-lived streaming tree doesn't accumulate entries for
+        # long-evicted values. Pass enable_cache=False for impure or
+        # cheap comparators.
+        self._cmp_cache: OrderedDict[tuple[CacheKey, CacheKey], asyncio.Future[int]] | None = (
+            OrderedDict() if enable_cache else None
+        )
+        self._cache_size = cache_size
         self._root: Node[T] | None = None
         self._head: Node[T] | None = None  # smallest element
         self._tail: Node[T] | None = None  # largest element
@@ -63,6 +117,55 @@ class BST(Generic[T]):
         self._on_evict = on_evict
         self._link_lock = asyncio.Lock()  # Protects tree modification and linked list operations
         self._size = 0
+        self._epoch = 0  # Bumped on every rotation; traversals restart on change
+        self._linear_count = 0  # Consecutive straight-spine inserts ("splay" mode)
+        self._first_linear: Node[T] | None = None  # First node of the current run
+        self._batch_depth = 0  # >0 while insert_many runs; suppresses rotations
+
+    def _is_live(self, node: Node[T]) -> bool:
+        """
+        Whether node is still threaded into the list.
+
+        _maybe_evict unlinks evicted nodes but leaves them in the tree;
+        such orphans must not absorb duplicate counts (invisible to
+        iteration) or serve as threading anchors.
+        """
+        return node is self._head or node.prev is not None or node.next is not None
+
+    async def _cached_compare(self, a: T, b: T) -> int:
+        """Compare a to b, memoizing via the inline future cache."""
+        cache = self._cmp_cache
+        if cache is None:
+            return await self._compare(a, b)
+
+        key = (_cache_key(a), _cache_key(b))
+        fut = cache.get(key)
+        if fut is not None:
+            cache.move_to_end(key)
+            return await fut
+
+        # compare(b, a) is the negation per the comparator contract, so a
+        # resolved or in-flight future for the reverse orientation serves
+        # this call too — one invocation covers both directions.
+        rev_key = (key[1], key[0])
+        rev = cache.get(rev_key)
+        if rev is not None:
+            cache.move_to_end(rev_key)
+            return -await rev
+
+        if len(cache) >= self._cache_size:
+            cache.popitem(last=False)
+        fut = asyncio.get_running_loop().create_future()
+        cache[key] = fut
+        try:
+            result = await self._compare(a, b)
+        except BaseException as e:
+            cache.pop(key, None)  # Let a later call retry
+            fut.set_exception(e)
+            fut.exception()  # Retrieved, in case no one else is waiting
+            raise
+        fut.set_result(result)
+        return result
 
     async def insert(self, value: T) -> None:
         """Insert value. Safe to call concurrently."""
@@ -85,79 +188,441 @@ class BST(Generic[T]):
             node = self._root
             parent: Node[T] | None = None
             go_left = False
+            path: list[Node[T]] = []  # root-to-parent chain for rebalancing
+            saved_epoch = self._epoch
 
             while node is not None:
-                saved_version = node.version
-                saved_left = node.left
-                saved_right = node.right
-
-                cmp = await self._compare(value, node.value)
-
-                # Check if tree changed during comparison
-                if node.version != saved_version:
-                    break  # Restart traversal
-
+                saved_epoch = self._epoch
+                cmp = await self._cached_compare(value, node.value)
+
+                # Rotations restructure the tree, so a traversal that saw
+                # one happen mid-compare may no longer be positioned over
+                # the right subtree. Restart from the root.
+                if self._epoch != saved_epoch:
+                    break
+
+                # Equal values collapse into the node's count: no further
+                # descent, no allocation, and no more comparator calls.
+                # Counts on nodes orphaned by eviction are invisible to
+                # the list, so for those fall through and descend right,
+                # as for any other duplicate.
+                if cmp == 0:
+                    async with self._link_lock:
+                        if self._is_live(node):
+                            node.count += 1
+                            self._size += 1
+                            await self._maybe_evict()
+                            return
+                    if self._epoch != saved_epoch:
+                        break  # Rotations while waiting on the lock
+
+                # Re-read the chosen child after the await: nodes are only
+                # ever added, so if a concurrent insert filled the slot we
+                # simply descend into the new node instead of restarting.
                 parent = node
+                path.append(node)
                 if cmp < 0:
                     go_left = True
-                    node = saved_left
+                    node = node.left
                 else:
                     go_left = False
-                    node = saved_right
+                    node = node.right
             else:
                 # Phase 2: Link new node (serialized with lock)
                 async with self._link_lock:
-                    # Re-verify insertion point is still valid
-                    if parent is None:
-                        # Tree became empty, shouldn't happen but handle it
-                        new_node = Node(value)
-                        self._root = new_node
-                        self._head = new_node
-                        self._tail = new_node
-                        self._size = 1
+                    new_node = self._link(parent, go_left, value, saved_epoch, path)
+                    if new_node is not None:
+                        if self._balance == "aa":
+                            self._rebalance(path)
+                        elif self._balance == "splay":
+                            self._track_linear_run(path, new_node)
                         await self._maybe_evict()
                         return
 
-                    if go_left:
-                        if parent.left is not None:
-                            # Slot taken, retry
-                            retries += 1
-                            continue
-                        new_node = Node(value)
-                        parent.left = new_node
-                        parent.version += 1
-                        # Link: new_node goes before parent in sorted order
-                        new_node.next = parent
-                        new_node.prev = parent.prev
-                        if parent.prev:
-                            parent.prev.next = new_node
-                        else:
-                            self._head = new_node
-                        parent.prev = new_node
-                    else:
-                        if parent.right is not None:
-                            # Slot taken, retry
-                            retries += 1
-                            continue
-                        new_node = Node(value)
-                        parent.right = new_node
-                        parent.version += 1
-                        # Link: new_node goes after parent in sorted order
-                        new_node.prev = parent
-                        new_node.next = parent.next
-                        if parent.next:
-                            parent.next.prev = new_node
-                        else:
-                            self._tail = new_node
-                        parent.next = new_node
-
-                    self._size += 1
+            retries += 1
+
+        raise RuntimeError(f"Insert failed after {self._max_retries} retries")
+
+    async def insert_many(self, values: list[T]) -> None:
+        """
+        Bulk insert with distribution by target node.
+
+        Gathering N individual inserts races every value to the root and
+        pays retries whenever two land on the same slot. Here each pivot
+        compares its whole incoming batch in one parallel gather, the two
+        halves descend concurrently, and a single task owns each
+        subtree's batch — so no two values ever contend for a slot and
+        nothing retries. Empty slots are filled with the middle element
+        of the batch bound for them, keeping bulk-built subtrees shallow.
+        """
+        if not values:
+            return
+        remaining = list(values)
+        # Rotations are suppressed for the duration: distribution relies
+        # on "batch belongs under this node" staying true across awaits.
+        self._batch_depth += 1
+        try:
+            if self._root is None:
+                async with self._link_lock:
+                    if self._root is None:
+                        mid = len(remaining) // 2
+                        self._link(None, False, remaining.pop(mid), self._epoch, [])
+                        await self._maybe_evict()
+            if remaining and self._root is not None:
+                await self._insert_batch(self._root, remaining, [self._root])
+        finally:
+            self._batch_depth -= 1
+
+    async def insert_many_sorted(self, values: list[T]) -> None:
+        """
+        Bulk load values that are already sorted (ascending, consistent
+        with the comparator) without any comparator calls.
+
+        For cheap orderings the await-per-compare machinery is pure
+        overhead: sort synchronously up front (sorted(), np.sort, ...)
+        and load here. On an empty tree this builds a balanced subtree
+        and threads the linked list with zero awaits; on a non-empty
+        tree it falls back to insert_many, since merging requires real
+        comparisons.
+        """
+        if not values:
+            return
+        if self._root is None:
+            async with self._link_lock:
+                if self._root is None:
+                    nodes = [Node(v) for v in values]
+                    for i in range(len(nodes) - 1):
+                        nodes[i].next = nodes[i + 1]
+                        nodes[i + 1].prev = nodes[i]
+                    self._head = nodes[0]
+                    self._tail = nodes[-1]
+                    self._root = self._build_balanced(nodes, 0, len(nodes) - 1)
+                    self._size = len(nodes)
                     await self._maybe_evict()
                     return
+        await self.insert_many(values)
+
+    def _build_balanced(self, nodes: list[Node[T]], lo: int, hi: int) -> Node[T] | None:
+        """Build a balanced subtree from in-order nodes[lo:hi + 1]."""
+        if lo > hi:
+            return None
+        mid = (lo + hi) // 2
+        node = nodes[mid]
+        node.left = self._build_balanced(nodes, lo, mid - 1)
+        node.right = self._build_balanced(nodes, mid + 1, hi)
+        # Keep AA levels consistent so later single inserts rebalance sanely
+        node.level = node.left.level + 1 if node.left else 1
+        return node
+
+    async def _insert_batch(
+        self, node: Node[T], values: list[T], chain: list[Node[T]]
+    ) -> None:
+        """
+        Distribute values into the subtree rooted at node.
+
+        chain is the root-to-node descent path, forwarded to _link for
+        threading under orphaned parents.
+        """
+        cmps = await asyncio.gather(
+            *[self._cached_compare(v, node.value) for v in values]
+        )
+        left_vals = [values[i] for i in range(len(values)) if cmps[i] < 0]
+        right_vals = [values[i] for i in range(len(values)) if cmps[i] > 0]
+
+        eq_vals = [values[i] for i in range(len(values)) if cmps[i] == 0]
+        if eq_vals:
+            async with self._link_lock:
+                if self._is_live(node):
+                    node.count += len(eq_vals)
+                    self._size += len(eq_vals)
+                    await self._maybe_evict()
+                    eq_vals = []
+            if eq_vals:
+                # Node orphaned by eviction: its count is invisible to the
+                # list, so route equals right like insert does.
+                right_vals.extend(eq_vals)
+
+        tasks = []
+        for side_vals, go_left in ((left_vals, True), (right_vals, False)):
+            if not side_vals:
+                continue
+            child = node.left if go_left else node.right
+            if child is None:
+                mid = len(side_vals) // 2
+                async with self._link_lock:
+                    child = self._link(node, go_left, side_vals[mid], self._epoch, chain)
+                    if child is not None:
+                        side_vals.pop(mid)
+                        await self._maybe_evict()
+                if child is None:
+                    # A concurrent insert claimed the slot; descend into it
+                    child = node.left if go_left else node.right
+            if side_vals and child is not None:
+                tasks.append(
+                    asyncio.create_task(
+                        self._insert_batch(child, side_vals, chain + [child])
+                    )
+                )
+        # At most two tasks: awaiting them directly skips gather's
+        # _GatheringFuture allocation and scheduling while both still
+        # run concurrently; on failure the sibling is cancelled and
+        # drained rather than leaking an unretrieved exception.
+        if tasks:
+            await _await_tasks(tasks)
+
+    def _link(
+        self,
+        parent: Node[T] | None,
+        go_left: bool,
+        value: T,
+        saved_epoch: int,
+        chain: list[Node[T]],
+    ) -> Node[T] | None:
+        """
+        Install value under parent's chosen slot and thread the linked list.
+
+        chain is the root-to-parent descent path, needed to thread
+        correctly when parent itself was orphaned by eviction. Must be
+        called holding _link_lock. Returns the new node, or None (caller
+        retries) if the slot was taken or a rotation moved parent since
+        the traversal validated its position.
+        """
+        if parent is None:
+            # Tree became empty, shouldn't happen but handle it
+            new_node = Node(value)
+            self._root = new_node
+            self._head = new_node
+            self._tail = new_node
+            self._size = 1
+            return new_node
+
+        # Waiting on the lock can yield; if a rotation happened meanwhile
+        # the traversal's position is no longer trustworthy.
+        if self._epoch != saved_epoch:
+            return None
+
+        if not self._is_live(parent):
+            # Parent was orphaned by eviction: it is no longer in the
+            # list, so its prev/next cannot anchor the new node. Thread
+            # relative to the nearest live in-order neighbor instead.
+            if (parent.left if go_left else parent.right) is not None:
+                return None  # Slot taken, retry
+            new_node = Node(value)
+            succ = self._live_successor(chain, go_left)
+            new_node.next = succ
+            if succ is not None:
+                new_node.prev = succ.prev
+                if succ.prev is not None:
+                    succ.prev.next = new_node
+                else:
+                    self._head = new_node
+                succ.prev = new_node
+            else:
+                new_node.prev = self._tail
+                if self._tail is not None:
+                    self._tail.next = new_node
+                else:
+                    self._head = new_node
+                self._tail = new_node
+            if go_left:
+                parent.left = new_node
+            else:
+                parent.right = new_node
+            self._size += 1
+            return new_node
+
+        if go_left:
+            if parent.left is not None:
+                # Slot taken, retry
+                return None
+            new_node = Node(value)
+            parent.left = new_node
+            # Link: new_node goes before parent in sorted order
+            new_node.next = parent
+            new_node.prev = parent.prev
+            if parent.prev:
+                parent.prev.next = new_node
+            else:
+                self._head = new_node
+            parent.prev = new_node
+        else:
+            if parent.right is not None:
+                # Slot taken, retry
+                return None
+            new_node = Node(value)
+            parent.right = new_node
+            # Link: new_node goes after parent in sorted order
+            new_node.prev = parent
+            new_node.next = parent.next
+            if parent.next:
+                parent.next.prev = new_node
+            else:
+                self._tail = new_node
+            parent.next = new_node
+
+        self._size += 1
+        return new_node
+
+    def _live_successor(self, chain: list[Node[T]], go_left: bool) -> Node[T] | None:
+        """
+        First live node in in-order after the empty slot described by
+        (chain[-1], go_left), skipping orphans.
+
+        Synchronous pointer walk over the recorded descent chain; only
+        used when linking under an orphaned parent, so the cost is
+        bounded by the orphan count. Must be called holding _link_lock.
+        """
+        def in_order(node: Node[T] | None) -> Iterator[Node[T]]:
+            stack: list[Node[T]] = []
+            while stack or node is not None:
+                while node is not None:
+                    stack.append(node)
+                    node = node.left
+                node = stack.pop()
+                yield node
+                node = node.right
+
+        def after_slot() -> Iterator[Node[T]]:
+            parent = chain[-1]
+            if go_left:
+                # The left slot precedes parent and its right subtree
+                yield parent
+                yield from in_order(parent.right)
+            child = parent
+            for ancestor in reversed(chain[:-1]):
+                if ancestor.left is child:
+                    yield ancestor
+                    yield from in_order(ancestor.right)
+                child = ancestor
+
+        for node in after_slot():
+            if self._is_live(node):
+                return node
+        return None
+
+    def _skew(self, node: Node[T]) -> Node[T]:
+        """AA-tree skew: rotate right when the left child shares our level."""
+        left = node.left
+        if left is not None and left.level == node.level:
+            node.left = left.right
+            left.right = node
+            return left
+        return node
+
+    def _split(self, node: Node[T]) -> Node[T]:
+        """AA-tree split: rotate left when two right descendants share our level."""
+        right = node.right
+        if right is not None and right.right is not None and right.right.level == node.level:
+            node.right = right.left
+            right.left = node
+            right.level += 1
+            return right
+        return node
+
+    def _rebalance(self, path: list[Node[T]]) -> None:
+        """
+        Apply AA skew/split along the insert path, deepest node first.
+
+        Pure pointer swaps with no awaits, so it adds O(log n) synchronous
+        work per insert while keeping the tree height logarithmic even on
+        sorted input. Must be called holding _link_lock.
+        """
+        if self._batch_depth:
+            return  # insert_many needs node positions to stay fixed
+        rotated = False
+        for i in range(len(path) - 1, -1, -1):
+            node = path[i]
+            new = self._split(self._skew(node))
+            if new is node:
+                continue
+            rotated = True
+            if i == 0:
+                self._root = new
+            else:
+                grandparent = path[i - 1]
+                if grandparent.left is node:
+                    grandparent.left = new
+                else:
+                    grandparent.right = new
+        if rotated:
+            self._epoch += 1
+
+    def _track_linear_run(self, path: list[Node[T]], new_node: Node[T]) -> None:
+        """
+        Count consecutive inserts that went straight down one spine from
+        the root; every _SPLAY_INTERVAL of them, splay the first node of
+        the run to the root. Far coarser than per-insert rotations, but
+        bounds height with zero comparator calls and near-zero work on
+        the common path. Must be called holding _link_lock.
+        """
+        if self._batch_depth:
+            return  # insert_many needs node positions to stay fixed
+        chain = path + [new_node]
+        steps = range(len(chain) - 1)
+        right_run = all(chain[i].right is chain[i + 1] for i in steps)
+        left_run = all(chain[i].left is chain[i + 1] for i in steps)
+        if len(chain) < 2 or not (right_run or left_run):
+            self._linear_count = 0
+            self._first_linear = None
+            return
 
-            retries += 1
+        if self._first_linear is None:
+            self._first_linear = new_node
+        self._linear_count += 1
+        if self._linear_count < self._SPLAY_INTERVAL:
+            return
 
-        raise RuntimeError(f"Insert failed after {self._max_retries} retries")
+        for idx, node in enumerate(chain):
+            if node is self._first_linear:
+                self._splay(chain[: idx + 1])
+                break
+        self._linear_count = 0
+        self._first_linear = None
+
+    def _rotate_up(self, parent: Node[T], child: Node[T]) -> None:
+        """Single rotation lifting child above its direct parent."""
+        if parent.left is child:
+            parent.left = child.right
+            child.right = parent
+        else:
+            parent.right = child.left
+            child.left = parent
+
+    def _splay(self, path: list[Node[T]]) -> None:
+        """
+        Splay path[-1] to the root via zig/zig-zig/zig-zag rotations.
+
+        path is the root-to-node chain. Pure pointer swaps, no awaits.
+        Must be called holding _link_lock.
+        """
+        chain = list(path)
+        x = chain.pop()
+        while chain:
+            parent = chain.pop()
+            if not chain:
+                self._rotate_up(parent, x)  # Zig: parent is the root
+                break
+            grand = chain.pop()
+            if (grand.left is parent) == (parent.left is x):
+                # Zig-zig: rotate parent over grandparent, then x over parent
+                self._rotate_up(grand, parent)
+                self._rotate_up(parent, x)
+            else:
+                # Zig-zag: rotate x over parent, then over grandparent
+                self._rotate_up(parent, x)
+                if grand.left is parent:
+                    grand.left = x
+                else:
+                    grand.right = x
+                self._rotate_up(grand, x)
+            if chain:
+                ancestor = chain[-1]
+                if ancestor.left is grand:
+                    ancestor.left = x
+                else:
+                    ancestor.right = x
+        self._root = x
+        self._epoch += 1
 
     async def _maybe_evict(self) -> None:
         """Evict lowest-ranked items if over max_size."""
@@ -166,48 +631,73 @@ class BST(Generic[T]):
 
         while self._size > self._max_size and self._head:
             evicted = self._head.value
-            # Unlink from list (leave orphaned in tree - harmless for correctness)
-            old_head = self._head
-            self._head = old_head.next
-            if self._head:
-                self._head.prev = None
+            if self._head.count > 1:
+                self._head.count -= 1
+                self._size -= 1
             else:
-                self._tail = None  # Tree is now empty
-            old_head.next = None  # Help GC
-            self._size -= 1
+                # Unlink from list (leave orphaned in tree - harmless for correctness)
+                old_head = self._head
+                self._head = old_head.next
+                if self._head:
+                    self._head.prev = None
+                else:
+                    self._tail = None  # Tree is now empty
+                old_head.next = None  # Help GC
+                self._size -= 1
 
             if self._on_evict:
                 await self._on_evict(evicted)
 
     async def contains(self, value: T) -> bool:
         """Check if value exists in tree."""
-        node = self._root
-        while node is not None:
-            cmp = await self._compare(value, node.value)
-            if cmp == 0:
-                return True
-            node = node.left if cmp < 0 else node.right
-        return False
+        while True:
+            node = self._root
+            while node is not None:
+                saved_epoch = self._epoch
+                cmp = await self._cached_compare(value, node.value)
+                if self._epoch != saved_epoch:
+                    break  # Rotation mid-compare, restart from root
+                if cmp == 0:
+                    return True
+                node = node.left if cmp < 0 else node.right
+            else:
+                return False
 
     def __iter__(self) -> Iterator[T]:
         """Iterate in sorted order via linked list. O(1) to start."""
         node = self._head
         while node is not None:
-            yield node.value
+            for _ in range(node.count):
+                yield node.value
             node = node.next
 
     def __reversed__(self) -> Iterator[T]:
         """Iterate in reverse sorted order."""
         node = self._tail
         while node is not None:
-            yield node.value
+            for _ in range(node.count):
+                yield node.value
             node = node.prev
 
     def to_list(self) -> list[T]:
         """Return sorted list. O(n) but no comparisons needed."""
-        return list(self)
+        head = self._head
+        if head is None:
+            return []
+        # Pre-size from the O(1) counter: one allocation, no amortized
+        # doubling as the list grows.
+        result = [head.value] * self._size
+        i = 0
+        node = head
+        while node is not None:
+            for _ in range(node.count):
+                result[i] = node.value
+                i += 1
+            node = node.next
+        return result
 
     def __len__(self) -> int:
+        """Number of items. O(1) via a counter maintained on insert/evict."""
         return self._size
 
     @property
@@ -225,36 +715,56 @@ class CachedCompare(Generic[T]):
     """
     Caches async comparison results.
 
-    Handles both (a,b) and (b,a) lookups.
+    Handles both (a,b) and (b,a) lookups. Keys on value equality for
+    hashable values, falling back to identity for unhashable ones.
 
     Example:
         cached = CachedCompare(llm_compare)
         tree = BST(cached)
     """
 
-    def __init__(self, compare: CompareFunc[T]):
+    def __init__(self, compare: CompareFunc[T], max_size: int = 10_000):
         self._compare = compare
-        self._cache: dict[tuple[int, int], int] = {}
-        self._lock = asyncio.Lock()
+        # Cache the promise, not the result: the future is stored before
+        # the compare runs, so callers racing on the same missing key all
+        # await one invocation instead of launching their own. Bounded
+        # LRU: hits refresh recency, inserts evict the oldest entry.
+        self._cache: OrderedDict[tuple[CacheKey, CacheKey], asyncio.Future[int]] = OrderedDict()
+        self._max_size = max_size
         self.hits = 0
         self.misses = 0
 
     async def __call__(self, a: T, b: T) -> int:
-        key = (id(a), id(b))
-        rev_key = (id(b), id(a))
-
-        async with self._lock:
-            if key in self._cache:
-                self.hits += 1
-                return self._cache[key]
-            if rev_key in self._cache:
-                self.hits += 1
-                return -self._cache[rev_key]
-
-        result = await self._compare(a, b)
-
-        async with self._lock:
-            self._cache[key] = result
-            self.misses += 1
-
+        key = (_cache_key(a), _cache_key(b))
+        rev_key = (key[1], key[0])
+
+        # No lock needed: the event loop is single-threaded and the dict
+        # operations between awaits are atomic. Awaiting an already
+        # resolved future returns without yielding to the loop.
+        # Single .get per orientation (futures are never None, so no
+        # sentinel is needed) rather than a membership check plus lookup.
+        fut = self._cache.get(key)
+        if fut is not None:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return await fut
+        fut = self._cache.get(rev_key)
+        if fut is not None:
+            self.hits += 1
+            self._cache.move_to_end(rev_key)
+            return -await fut
+
+        if len(self._cache) >= self._max_size:
+            self._cache.popitem(last=False)
+        fut: asyncio.Future[int] = asyncio.get_running_loop().create_future()
+        self._cache[key] = fut
+        self.misses += 1
+        try:
+            result = await self._compare(a, b)
+        except BaseException as e:
+            self._cache.pop(key, None)  # Let a later call retry
+            fut.set_exception(e)
+            fut.exception()  # Retrieved, in case no one else is waiting
+            raise
+        fut.set_result(result)
         return result
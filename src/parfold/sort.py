@@ -2,7 +2,7 @@
 
 from typing import TypeVar, Callable, Awaitable
 import asyncio
-from .primitives import unfold
+from .primitives import unfold, _await_tasks
 
 T = TypeVar("T")
 
@@ -100,10 +100,11 @@ async def mergesort(
             return items
 
         mid = len(items) // 2
-        left, right = await asyncio.gather(
-            sort(items[:mid]),
-            sort(items[mid:])
-        )
+        left_task = asyncio.create_task(sort(items[:mid]))
+        right_task = asyncio.create_task(sort(items[mid:]))
+        # No _GatheringFuture for the two-element case; both halves still
+        # sort concurrently and failures cancel/drain the sibling.
+        left, right = await _await_tasks([left_task, right_task])
         return await merge(left, right)
 
     return await sort(items)
@@ -10,6 +10,12 @@ async def int_compare(a: int, b: int) -> int:
     return a - b
 
 
+def _depth(node) -> int:
+    if node is None:
+        return 0
+    return 1 + max(_depth(node.left), _depth(node.right))
+
+
 class TestBST:
     @pytest.mark.asyncio
     async def test_empty_tree(self):
@@ -100,6 +106,64 @@ class TestBST:
         assert len(tree) == 5
         assert tree.to_list() == [5, 5, 5, 5, 5]
 
+    @pytest.mark.asyncio
+    async def test_duplicates_use_one_compare_each(self):
+        call_count = 0
+
+        async def counting_compare(a: int, b: int) -> int:
+            nonlocal call_count
+            call_count += 1
+            return a - b
+
+        tree = BST(counting_compare, enable_cache=False)
+        for _ in range(5):
+            await tree.insert(5)
+        # First insert is compare-free; the rest stop at the root
+        assert call_count == 4
+        assert tree.to_list() == [5, 5, 5, 5, 5]
+
+    @pytest.mark.asyncio
+    async def test_duplicates_with_eviction(self):
+        tree = BST(int_compare, max_size=3)
+        for x in [5, 5, 5, 3, 7]:
+            await tree.insert(x)
+        assert len(tree) == 3
+        assert tree.to_list() == [5, 5, 7]
+
+    @pytest.mark.asyncio
+    async def test_reinsert_evicted_value(self):
+        """A duplicate of an evicted orphan must not bump the orphan's count."""
+        tree = BST(int_compare, max_size=2)
+        for x in [1, 2, 3]:
+            await tree.insert(x)
+        assert tree.to_list() == [2, 3]
+        await tree.insert(1)  # Matches the orphaned node, then evicts again
+        assert tree.to_list() == [2, 3]
+        assert len(tree) == 2
+
+    @pytest.mark.asyncio
+    async def test_insert_threads_past_orphans(self):
+        """Linking under an orphaned parent finds the live successor."""
+        tree = BST(int_compare, max_size=4)
+        for x in [1, 2, 3, 4, 5, 6]:
+            await tree.insert(x)
+        assert tree.to_list() == [3, 4, 5, 6]
+        tree._max_size = 10  # Stop evicting so the new node stays visible
+        await tree.insert(2)  # Equal to an orphan; descends past it
+        assert tree.to_list() == [2, 3, 4, 5, 6]
+        assert len(tree) == 5
+
+    @pytest.mark.asyncio
+    async def test_keep_top_n_stream_with_duplicates(self):
+        tree = BST(int_compare, max_size=10)
+        items = [i % 20 for i in range(80)]
+        random.shuffle(items)
+        for i, x in enumerate(items):
+            await tree.insert(x)
+            current = tree.to_list()
+            assert len(current) == len(tree) == min(i + 1, 10)
+            assert current == sorted(current)
+
     @pytest.mark.asyncio
     async def test_sorted_input(self):
         tree = BST(int_compare)
@@ -114,6 +178,199 @@ class TestBST:
         await asyncio.gather(*[tree.insert(x) for x in items])
         assert tree.to_list() == sorted(items)
 
+    @pytest.mark.asyncio
+    async def test_sorted_input_stays_shallow(self):
+        """Rebalancing keeps depth logarithmic on sorted input."""
+        tree = BST(int_compare)
+        for x in range(128):
+            await tree.insert(x)
+        assert tree.to_list() == list(range(128))
+        assert _depth(tree._root) <= 2 * 8  # AA bound: 2 * log2(n + 1)
+
+    @pytest.mark.asyncio
+    async def test_reverse_sorted_input_stays_shallow(self):
+        tree = BST(int_compare)
+        for x in range(128, 0, -1):
+            await tree.insert(x)
+        assert tree.to_list() == list(range(1, 129))
+        assert _depth(tree._root) <= 2 * 8
+
+    @pytest.mark.asyncio
+    async def test_inline_cache_dedupes_compares(self):
+        call_count = 0
+
+        async def counting_compare(a: int, b: int) -> int:
+            nonlocal call_count
+            call_count += 1
+            return a - b
+
+        tree = BST(counting_compare)
+        await tree.insert(10)
+        await tree.insert(5)  # compare(5, 10)
+        await tree.insert(5)  # compare(5, 10) cached, compare(5, 5) fresh
+        assert call_count == 2
+        assert tree.to_list() == [5, 5, 10]
+
+    @pytest.mark.asyncio
+    async def test_inline_cache_uses_antisymmetry(self):
+        call_count = 0
+
+        async def slow_compare(a: int, b: int) -> int:
+            nonlocal call_count
+            call_count += 1
+            await asyncio.sleep(0)
+            return a - b
+
+        tree = BST(slow_compare)
+        results = await asyncio.gather(
+            tree._cached_compare(3, 5),
+            tree._cached_compare(5, 3),
+        )
+        assert results == [-2, 2]
+        assert call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_inline_cache_is_bounded(self):
+        call_count = 0
+
+        async def counting_compare(a: int, b: int) -> int:
+            nonlocal call_count
+            call_count += 1
+            return a - b
+
+        tree = BST(counting_compare, cache_size=2)
+        await tree._cached_compare(1, 2)
+        await tree._cached_compare(3, 4)
+        await tree._cached_compare(1, 2)  # Hit, refreshes (1, 2)
+        await tree._cached_compare(5, 6)  # Evicts (3, 4)
+        assert call_count == 3
+        assert len(tree._cmp_cache) == 2
+
+        await tree._cached_compare(3, 4)  # Was evicted, recomputed
+        assert call_count == 4
+
+    @pytest.mark.asyncio
+    async def test_cache_disabled(self):
+        call_count = 0
+
+        async def counting_compare(a: int, b: int) -> int:
+            nonlocal call_count
+            call_count += 1
+            return a - b
+
+        tree = BST(counting_compare, enable_cache=False)
+        await tree.insert(5)
+        assert await tree.contains(5)
+        assert await tree.contains(5)
+        assert call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_insert_many(self):
+        tree = BST(int_compare)
+        items = list(range(100))
+        random.shuffle(items)
+        await tree.insert_many(items)
+        assert len(tree) == 100
+        assert tree.to_list() == sorted(items)
+
+    @pytest.mark.asyncio
+    async def test_insert_many_empty(self):
+        tree = BST(int_compare)
+        await tree.insert_many([])
+        assert len(tree) == 0
+
+    @pytest.mark.asyncio
+    async def test_insert_many_sorted_stays_shallow(self):
+        """Median-picking keeps bulk-built subtrees shallow even on sorted input."""
+        tree = BST(int_compare)
+        await tree.insert_many(list(range(128)))
+        assert tree.to_list() == list(range(128))
+        assert _depth(tree._root) <= 2 * 8
+
+    @pytest.mark.asyncio
+    async def test_insert_many_sorted_uses_no_compares(self):
+        call_count = 0
+
+        async def counting_compare(a: int, b: int) -> int:
+            nonlocal call_count
+            call_count += 1
+            return a - b
+
+        tree = BST(counting_compare)
+        await tree.insert_many_sorted(list(range(100)))
+        assert call_count == 0
+        assert len(tree) == 100
+        assert tree.to_list() == list(range(100))
+        assert list(reversed(tree)) == list(range(99, -1, -1))
+        assert _depth(tree._root) <= 8
+
+    @pytest.mark.asyncio
+    async def test_insert_many_sorted_nonempty_falls_back(self):
+        tree = BST(int_compare)
+        await tree.insert(50)
+        await tree.insert_many_sorted([10, 20, 60])
+        assert tree.to_list() == [10, 20, 50, 60]
+
+    @pytest.mark.asyncio
+    async def test_insert_many_comparator_failure_propagates(self):
+        async def failing_compare(a: int, b: int) -> int:
+            await asyncio.sleep(0)
+            raise RuntimeError("backend down")
+
+        tree = BST(failing_compare, enable_cache=False)
+        await tree.insert(10)  # Empty-tree insert needs no compare
+        with pytest.raises(RuntimeError):
+            await tree.insert_many([5, 15, 20])
+        assert tree.to_list() == [10]
+
+    @pytest.mark.asyncio
+    async def test_insert_many_into_existing_tree(self):
+        tree = BST(int_compare)
+        for x in [50, 25, 75]:
+            await tree.insert(x)
+        await tree.insert_many([10, 30, 60, 90, 50])
+        assert tree.to_list() == [10, 25, 30, 50, 50, 60, 75, 90]
+
+    @pytest.mark.asyncio
+    async def test_splay_mode_bounds_linear_runs(self):
+        tree = BST(int_compare, balance="splay")
+        tree._SPLAY_INTERVAL = 8
+        for x in range(64):
+            await tree.insert(x)
+        assert tree.to_list() == list(range(64))
+        assert _depth(tree._root) < 64
+
+    @pytest.mark.asyncio
+    async def test_no_balance_mode(self):
+        tree = BST(int_compare, balance=None)
+        items = [5, 3, 7, 1, 9]
+        for x in items:
+            await tree.insert(x)
+        assert tree.to_list() == sorted(items)
+
+    def test_unknown_balance_mode(self):
+        with pytest.raises(ValueError):
+            BST(int_compare, balance="avl")
+
+    @pytest.mark.asyncio
+    async def test_len_matches_traversal(self):
+        """The O(1) size counter never drifts from the actual contents."""
+        tree = BST(int_compare)
+        items = list(range(30)) * 2  # Duplicates exercise the count path
+        random.shuffle(items)
+        for i, x in enumerate(items):
+            await tree.insert(x)
+            assert len(tree) == len(tree.to_list()) == i + 1
+
+    @pytest.mark.asyncio
+    async def test_len_matches_traversal_with_eviction(self):
+        """Counter stays in sync on a keep-top-N ascending stream."""
+        tree = BST(int_compare, max_size=40)
+        for i in range(60):
+            await tree.insert(i)
+            assert len(tree) == len(tree.to_list()) == min(i + 1, 40)
+        assert tree.to_list() == list(range(20, 60))
+
     @pytest.mark.asyncio
     async def test_linked_list_integrity(self):
         """Verify linked list is properly threaded after parallel inserts."""
@@ -177,6 +434,74 @@ class TestCachedCompare:
         assert call_count == 1
         assert cached.hits == 1
 
+    @pytest.mark.asyncio
+    async def test_equal_values_share_entries(self):
+        call_count = 0
+
+        async def str_compare(a: str, b: str) -> int:
+            nonlocal call_count
+            call_count += 1
+            return (a > b) - (a < b)
+
+        cached = CachedCompare(str_compare)
+
+        await cached("".join(["ab", "ab"]), "zz")
+        await cached("".join(["a", "bab"]), "zz")  # Equal but not identical
+        assert call_count == 1
+        assert cached.hits == 1
+
+    @pytest.mark.asyncio
+    async def test_unhashable_values_fall_back_to_identity(self):
+        async def len_compare(a: list, b: list) -> int:
+            return len(a) - len(b)
+
+        cached = CachedCompare(len_compare)
+
+        xs, ys = [1], [2, 3]
+        assert await cached(xs, ys) == -1
+        assert await cached(xs, ys) == -1
+        assert cached.hits == 1
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction(self):
+        call_count = 0
+
+        async def counting_compare(a: int, b: int) -> int:
+            nonlocal call_count
+            call_count += 1
+            return a - b
+
+        cached = CachedCompare(counting_compare, max_size=2)
+
+        await cached(1, 2)
+        await cached(3, 4)
+        await cached(1, 2)  # Hit, refreshes (1, 2)
+        await cached(5, 6)  # Evicts (3, 4)
+        assert call_count == 3
+
+        await cached(1, 2)  # Still cached
+        assert call_count == 3
+        await cached(3, 4)  # Was evicted, recomputed
+        assert call_count == 4
+
+    @pytest.mark.asyncio
+    async def test_coalesces_concurrent_calls(self):
+        call_count = 0
+
+        async def slow_compare(a: int, b: int) -> int:
+            nonlocal call_count
+            call_count += 1
+            await asyncio.sleep(0)
+            return a - b
+
+        cached = CachedCompare(slow_compare)
+
+        results = await asyncio.gather(*[cached(3, 5) for _ in range(10)])
+        assert results == [-2] * 10
+        assert call_count == 1
+        assert cached.misses == 1
+        assert cached.hits == 9
+
     @pytest.mark.asyncio
     async def test_with_bst(self):
         call_count = 0